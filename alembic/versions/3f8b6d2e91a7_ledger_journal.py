@@ -0,0 +1,52 @@
+"""Ledger journal
+
+Revision ID: 3f8b6d2e91a7
+Revises: e5c2a8f17d64
+Create Date: 2026-10-18 11:48:05.913442
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f8b6d2e91a7'
+down_revision: Union[str, Sequence[str], None] = 'e5c2a8f17d64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ledger_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('transaction_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_ledger_entries_account_id_id', 'ledger_entries', ['account_id', 'id'], unique=False)
+    op.create_index(op.f('ix_ledger_entries_transaction_id'), 'ledger_entries', ['transaction_id'], unique=False)
+    op.create_table('balance_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.Column('as_of', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_balance_checkpoints_account_id_entry_id', 'balance_checkpoints', ['account_id', 'entry_id'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_balance_checkpoints_account_id_entry_id', table_name='balance_checkpoints')
+    op.drop_table('balance_checkpoints')
+    op.drop_index(op.f('ix_ledger_entries_transaction_id'), table_name='ledger_entries')
+    op.drop_index('ix_ledger_entries_account_id_id', table_name='ledger_entries')
+    op.drop_table('ledger_entries')
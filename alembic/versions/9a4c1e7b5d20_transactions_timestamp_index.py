@@ -0,0 +1,28 @@
+"""Transactions timestamp index
+
+Revision ID: 9a4c1e7b5d20
+Revises: 3f8b6d2e91a7
+Create Date: 2026-10-18 13:02:41.227815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c1e7b5d20'
+down_revision: Union[str, Sequence[str], None] = '3f8b6d2e91a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_transactions_timestamp_id', 'transactions', ['timestamp', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_transactions_timestamp_id', table_name='transactions')
@@ -0,0 +1,28 @@
+"""Account version
+
+Revision ID: b41d7e9a0c3f
+Revises: 7c76411a6e58
+Create Date: 2026-10-18 10:14:52.118307
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d7e9a0c3f'
+down_revision: Union[str, Sequence[str], None] = '7c76411a6e58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('accounts', sa.Column('version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('accounts', 'version')
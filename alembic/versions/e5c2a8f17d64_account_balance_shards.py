@@ -0,0 +1,36 @@
+"""Account balance shards
+
+Revision ID: e5c2a8f17d64
+Revises: b41d7e9a0c3f
+Create Date: 2026-10-18 11:02:37.540126
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c2a8f17d64'
+down_revision: Union[str, Sequence[str], None] = 'b41d7e9a0c3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('accounts', sa.Column('shard_count', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table('account_balance_shards',
+    sa.Column('account_id', sa.Integer(), nullable=False),
+    sa.Column('slot', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['account_id'], ['accounts.id'], ),
+    sa.PrimaryKeyConstraint('account_id', 'slot')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('account_balance_shards')
+    op.drop_column('accounts', 'shard_count')
@@ -10,6 +10,17 @@ class Account(Base):
     name = Column(String, default="Main", nullable=False) 
     currency = Column(String(3), default="USD", nullable=False) 
     balance = Column(Float, nullable=False, default=0.0)
+    version = Column(Integer, nullable=False, default=0)
+    # > 0 marks a hot account whose incoming credits are spread over that many shards
+    shard_count = Column(Integer, nullable=False, default=0)
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     user = relationship("User", back_populates="accounts")
+
+
+class AccountBalanceShard(Base):
+    __tablename__ = "account_balance_shards"
+
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    slot = Column(Integer, primary_key=True)
+    balance = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.sessions import get_db
+from app.core.security import get_current_user
+from app.apis.permissions import allow_admin_only
+from app.apis.users import models as users
+from . import schemas, service
+
+router = APIRouter(
+    dependencies=[Depends(get_current_user)]
+)
+
+@router.get("/me", response_model=schemas.AccountRead)
+async def read_my_account(
+    db: AsyncSession = Depends(get_db),
+    current_user: users.User = Depends(get_current_user)
+):
+    account = await service.get_account_with_balance(db=db, account_id=current_user.id)
+
+    if account is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+
+    return account
+
+@router.get("/me/balance", response_model=schemas.AccountBalance)
+async def read_my_balance(
+    db: AsyncSession = Depends(get_db),
+    current_user: users.User = Depends(get_current_user),
+    as_of: datetime | None = Query(None)
+):
+    if as_of is None:
+        balance = await service.get_balance(db=db, account_id=current_user.id)
+    else:
+        balance = await service.get_balance_as_of(db=db, account_id=current_user.id, as_of=as_of)
+
+    if balance is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Account not found"
+        )
+
+    return {"account_id": current_user.id, "balance": balance, "as_of": as_of}
+
+@router.put("/{account_id}/shards", response_model=schemas.AccountRead)
+async def set_account_shards(
+    account_id: int,
+    shards_in: schemas.AccountShardsUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_admin: users.User = Depends(allow_admin_only)
+):
+    account = await service.set_shard_count(db=db, account_id=account_id, shard_count=shards_in.shard_count)
+    return account
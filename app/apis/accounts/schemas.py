@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from pydantic import ConfigDict
+from datetime import datetime
+
+
+class AccountRead(BaseModel):
+    id: int
+    name: str
+    currency: str
+    balance: float
+    shard_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class AccountShardsUpdate(BaseModel):
+    shard_count: int = Field(ge=0, le=256)
+
+
+class AccountBalance(BaseModel):
+    account_id: int
+    balance: float
+    as_of: datetime | None = None
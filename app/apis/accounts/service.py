@@ -0,0 +1,114 @@
+import random
+from datetime import datetime
+from typing import Dict, Iterable
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy import update, delete, case, func
+from fastapi import HTTPException, status
+
+from app.apis.ledger import service as ledger_service
+from .models import Account, AccountBalanceShard
+
+
+def _total_balance(as_of: datetime | None = None):
+    # Account row + hot-account shards + journal entries (see ledger.service)
+    shard_total = (
+        select(func.coalesce(func.sum(AccountBalanceShard.balance), 0.0))
+        .where(AccountBalanceShard.account_id == Account.id)
+        .correlate_except(AccountBalanceShard)
+        .scalar_subquery()
+    )
+    return Account.balance + shard_total + ledger_service.journal_balance(Account.id, as_of=as_of)
+
+async def get_balances(db: AsyncSession, account_ids: Iterable[int]) -> Dict[int, float]:
+    query = select(Account.id, _total_balance()).where(Account.id.in_(set(account_ids)))
+    result = await db.execute(query)
+    return {account_id: balance for account_id, balance in result.all()}
+
+async def get_balance(db: AsyncSession, account_id: int) -> float | None:
+    query = select(_total_balance()).where(Account.id == account_id)
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+async def get_balance_as_of(db: AsyncSession, account_id: int, as_of: datetime) -> float | None:
+    # Exact for history written in journal mode, where only entries move money
+    query = select(_total_balance(as_of=as_of)).where(Account.id == account_id)
+    result = await db.execute(query)
+    return result.scalar_one_or_none()
+
+async def get_account_with_balance(db: AsyncSession, account_id: int) -> dict | None:
+    account = await db.get(Account, account_id)
+    if account is None:
+        return None
+
+    return {
+        "id": account.id,
+        "name": account.name,
+        "currency": account.currency,
+        "balance": await get_balance(db, account_id),
+        "shard_count": account.shard_count
+    }
+
+def shard_slot(shard_count: int) -> int:
+    return random.randrange(shard_count)
+
+async def credit(db: AsyncSession, account_id: int, amount: float, shard_count: int = 0) -> None:
+    # Hot accounts take credits on one shard row, so concurrent payers
+    # contend on shard_count locks instead of the single account row.
+    if shard_count:
+        query = (
+            update(AccountBalanceShard)
+            .where(AccountBalanceShard.account_id == account_id, AccountBalanceShard.slot == shard_slot(shard_count))
+            .values(balance=AccountBalanceShard.balance + amount)
+        )
+        result = await db.execute(query)
+        if result.rowcount == 1:
+            return
+
+    query = (
+        update(Account)
+        .where(Account.id == account_id)
+        .values(balance=Account.balance + amount, version=Account.version + 1)
+    )
+    await db.execute(query)
+
+async def fold_shards(db: AsyncSession, account_id: int) -> float:
+    """Drain every shard of a hot account; the caller adds the result to Account.balance."""
+    query = (
+        select(AccountBalanceShard.slot, AccountBalanceShard.balance)
+        .where(AccountBalanceShard.account_id == account_id)
+        .order_by(AccountBalanceShard.slot)
+        .with_for_update()
+    )
+    result = await db.execute(query)
+    folded = {slot: balance for slot, balance in result.all() if balance}
+
+    if folded:
+        query = (
+            update(AccountBalanceShard)
+            .where(AccountBalanceShard.account_id == account_id, AccountBalanceShard.slot.in_(folded))
+            .values(balance=AccountBalanceShard.balance - case(folded, value=AccountBalanceShard.slot))
+        )
+        await db.execute(query)
+
+    return sum(folded.values())
+
+async def set_shard_count(db: AsyncSession, account_id: int, shard_count: int) -> dict:
+    query = select(Account).where(Account.id == account_id).with_for_update()
+    result = await db.execute(query)
+    account = result.scalar_one_or_none()
+
+    if account is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Account not found")
+
+    folded = await fold_shards(db, account_id)
+    await db.execute(delete(AccountBalanceShard).where(AccountBalanceShard.account_id == account_id))
+
+    db.add_all([AccountBalanceShard(account_id=account_id, slot=slot, balance=0.0) for slot in range(shard_count)])
+    account.balance = Account.balance + folded
+    account.version = Account.version + 1
+    account.shard_count = shard_count
+
+    await db.commit()
+
+    return await get_account_with_balance(db, account_id)
@@ -0,0 +1,7 @@
+from app.db.sessions import SessionLocal
+from . import service
+
+
+async def compact_checkpoints():
+    async with SessionLocal() as db:
+        await service.compact_checkpoints(db)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey, DateTime, Index, func
+
+from app.db.base import Base
+
+class LedgerEntry(Base):
+    __tablename__ = "ledger_entries"
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    # Not a foreign key: entries are immutable and outlive deleted transaction records
+    transaction_id = Column(Integer, nullable=False, index=True)
+    amount = Column(Float, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_ledger_entries_account_id_id", "account_id", "id"),
+    )
+
+
+class BalanceCheckpoint(Base):
+    __tablename__ = "balance_checkpoints"
+
+    id = Column(Integer, primary_key=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=False)
+    # Sum of every entry of the account up to and including entry_id
+    entry_id = Column(Integer, nullable=False)
+    balance = Column(Float, nullable=False)
+    as_of = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("ix_balance_checkpoints_account_id_entry_id", "account_id", "entry_id", unique=True),
+    )
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import insert, func
+
+from app.core.settings import settings
+from app.apis.transactions.models import Transaction
+from .models import LedgerEntry, BalanceCheckpoint
+
+
+def journal_balance(account_id, as_of: datetime | None = None):
+    """SQL expression for an account's journal balance: latest checkpoint plus the entries after it.
+
+    ``account_id`` may be a value or a column, e.g. ``Account.id`` to correlate per row.
+    """
+    checkpoints = select(BalanceCheckpoint).where(BalanceCheckpoint.account_id == account_id)
+    if as_of is not None:
+        checkpoints = checkpoints.where(BalanceCheckpoint.as_of <= as_of)
+    checkpoints = checkpoints.order_by(BalanceCheckpoint.entry_id.desc()).limit(1).correlate_except(BalanceCheckpoint)
+
+    checkpoint_entry_id = checkpoints.with_only_columns(BalanceCheckpoint.entry_id).scalar_subquery()
+    checkpoint_balance = checkpoints.with_only_columns(BalanceCheckpoint.balance).scalar_subquery()
+
+    since = select(func.coalesce(func.sum(LedgerEntry.amount), 0.0)).where(
+        LedgerEntry.account_id == account_id,
+        LedgerEntry.id > func.coalesce(checkpoint_entry_id, 0)
+    ).correlate_except(LedgerEntry)
+    if as_of is not None:
+        since = since.where(LedgerEntry.created_at <= as_of)
+
+    return func.coalesce(checkpoint_balance, 0.0) + since.scalar_subquery()
+
+async def record_transfers(db: AsyncSession, transactions: Iterable[Transaction]) -> None:
+    rows = []
+    for transaction in transactions:
+        rows.append({"account_id": transaction.sender_account_id, "transaction_id": transaction.id, "amount": -transaction.amount})
+        rows.append({"account_id": transaction.recipient_account_id, "transaction_id": transaction.id, "amount": transaction.amount})
+
+    if rows:
+        await db.execute(insert(LedgerEntry), rows)
+
+async def compact_checkpoints(db: AsyncSession) -> int:
+    """Fold the entries written since each account's last checkpoint into a new checkpoint."""
+    cutoff = select(func.max(LedgerEntry.id))
+    if settings.LEDGER_COMPACTION_LAG_SECONDS:
+        # Leave recent entries alone: a lower id may still belong to an uncommitted transfer
+        cutoff = cutoff.where(LedgerEntry.created_at < datetime.now() - timedelta(seconds=settings.LEDGER_COMPACTION_LAG_SECONDS))
+    cutoff_id = (await db.execute(cutoff)).scalar()
+
+    if cutoff_id is None:
+        return 0
+
+    previous = (
+        select(BalanceCheckpoint)
+        .where(BalanceCheckpoint.account_id == LedgerEntry.account_id)
+        .order_by(BalanceCheckpoint.entry_id.desc())
+        .limit(1)
+        .correlate_except(BalanceCheckpoint)
+    )
+    previous_entry_id = previous.with_only_columns(BalanceCheckpoint.entry_id).scalar_subquery()
+    previous_balance = previous.with_only_columns(BalanceCheckpoint.balance).scalar_subquery()
+
+    new_checkpoints = (
+        select(
+            LedgerEntry.account_id,
+            func.max(LedgerEntry.id),
+            func.coalesce(previous_balance, 0.0) + func.sum(LedgerEntry.amount),
+            func.max(LedgerEntry.created_at)
+        )
+        .where(LedgerEntry.id > func.coalesce(previous_entry_id, 0), LedgerEntry.id <= cutoff_id)
+        .group_by(LedgerEntry.account_id)
+    )
+    query = insert(BalanceCheckpoint).from_select(["account_id", "entry_id", "balance", "as_of"], new_checkpoints)
+
+    try:
+        result = await db.execute(query)
+        await db.commit()
+    except IntegrityError:
+        # Another worker wrote the same checkpoints first
+        await db.rollback()
+        return 0
+
+    return result.rowcount
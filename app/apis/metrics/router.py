@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+
+from app.apis.permissions import allow_admin_only
+from app.apis.users import models as users
+from app.core.metrics import metrics
+
+router = APIRouter()
+
+@router.get("/")
+async def read_metrics(current_admin: users.User = Depends(allow_admin_only)):
+    return metrics.snapshot()
@@ -1,10 +1,72 @@
-from typing import Dict
-from fastapi import Query
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Dict, Generic, List, Sequence, TypeVar
 
-PaginationParams = Dict[str, int]
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+from sqlalchemy import DateTime, Select, func, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-def get_pagination_params(
-    skip: int = Query(0, ge=0),
+T = TypeVar("T")
+
+CursorParams = Dict[str, str | int | None]
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: str | None = None
+
+
+def get_cursor_params(
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(10, ge=1, le=100)
-) -> PaginationParams:
-    return {"skip": skip, "limit": limit}
\ No newline at end of file
+) -> CursorParams:
+    return {"cursor": cursor, "limit": limit}
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+def _sort_key(column, value, sqlite: bool):
+    # SQLite keeps CURRENT_TIMESTAMP defaults without fractional seconds but
+    # binds datetimes with them, so text comparison would be off by a suffix.
+    if sqlite and isinstance(column.type, DateTime):
+        return func.strftime("%Y-%m-%d %H:%M:%f", value)
+    return value
+
+async def paginate(db: AsyncSession, query: Select, columns: Sequence, params: CursorParams, descending: bool = False) -> dict:
+    # Keyset pagination: seek past the last row of the previous page with a
+    # row-value comparison on an indexed sort key instead of OFFSET, so every
+    # page is an index range scan of `limit` rows.
+    # `columns` must be unique together (end with the primary key).
+    sqlite = db.get_bind().dialect.name == "sqlite"
+    keys = [_sort_key(column, column, sqlite) for column in columns]
+    if params["cursor"] is not None:
+        values = decode_cursor(params["cursor"], columns)
+        bound = tuple_(*[_sort_key(column, literal(value, column.type), sqlite) for column, value in zip(columns, values)])
+        query = query.where(tuple_(*keys) < bound if descending else tuple_(*keys) > bound)
+
+    order_by = [key.desc() if descending else key.asc() for key in keys]
+    result = await db.execute(query.order_by(*order_by).limit(params["limit"] + 1))
+    items = result.scalars().all()
+
+    next_cursor = None
+    if len(items) > params["limit"]:
+        items = items[:params["limit"]]
+        next_cursor = encode_cursor([getattr(items[-1], column.key) for column in columns])
+
+    return {"items": items, "next_cursor": next_cursor}
@@ -1,9 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from datetime import date
+from datetime import date, datetime, time
 from app.apis.users import models as users
 from ..transactions import models as transaction_models
 from app.apis.accounts.models import Account 
+from app.apis.accounts import service as accounts_service
+from app.core.settings import settings
 from fastapi import HTTPException, status
 from sqlalchemy import func
 
@@ -29,9 +31,13 @@ async def get_summary_report(db: AsyncSession, user: users.User, start_date: dat
     total_expense = await db.execute(expense_query)
     total_expense = total_expense.scalar_one_or_none()
 
-    query_ending_balance = select(Account.balance).where(Account.id == user.id)
-    ending_balance = await db.execute(query_ending_balance)
-    ending_balance = ending_balance.scalar_one_or_none() or 0.0
+    if settings.TRANSFER_MODE == "journal":
+        # Checkpoints make the balance at the end of the period a cheap lookup
+        ending_balance = await accounts_service.get_balance_as_of(
+            db, account_id=user.id, as_of=datetime.combine(end_date, time.min)
+        ) or 0.0
+    else:
+        ending_balance = await accounts_service.get_balance(db, account_id=user.id) or 0.0
 
     if total_income is None or total_expense is None:
         raise HTTPException(
@@ -0,0 +1,81 @@
+import asyncio
+import contextvars
+from typing import List, Set, Tuple
+
+from fastapi import HTTPException
+
+from app.apis.users import models as users
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.db.sessions import SessionLocal
+from . import models, schemas, service
+
+
+class TransferCoalescer:
+    """Group transfers that arrive within a short window into one DB transaction (one commit)."""
+
+    def __init__(self, session_factory=SessionLocal, window: float | None = None, max_items: int | None = None):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_items = max_items
+        self._pending: List[Tuple[users.User, schemas.TransactionCreate, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: Set[asyncio.Task] = set()
+
+    async def submit(self, sender: users.User, transaction: schemas.TransactionCreate) -> models.Transaction:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((sender, transaction, future))
+
+        max_items = self.max_items or settings.TRANSFER_COALESCE_MAX_ITEMS
+        if len(self._pending) >= max_items:
+            self._flush_pending()
+        elif self._timer is None:
+            window = self.window if self.window is not None else settings.TRANSFER_COALESCE_WINDOW
+            self._timer = loop.call_later(window, self._flush_pending)
+
+        return await future
+
+    async def close(self):
+        self._flush_pending()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+    def _flush_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        # A fresh context keeps the batch's statements out of whichever
+        # request happened to trigger the flush (see track_round_trips).
+        task = asyncio.create_task(self._flush(batch), context=contextvars.Context())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[users.User, schemas.TransactionCreate, asyncio.Future]]):
+        metrics.incr("coalescer_batches")
+        metrics.incr("coalescer_items", len(batch))
+
+        try:
+            async with self.session_factory() as db:
+                outcomes = await service.apply_transfers(db, [(sender, transaction) for sender, transaction, _ in batch])
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, _, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if outcome["status"] == "created":
+                future.set_result(outcome["transaction"])
+            else:
+                future.set_exception(HTTPException(status_code=400, detail=outcome["detail"]))
+
+
+coalescer = TransferCoalescer()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, Enum, DateTime, func
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Boolean, Enum, DateTime, Index, func
 from app.db.base import Base
 from sqlalchemy.orm import relationship
 
@@ -14,4 +14,8 @@ class Transaction(Base):
     sender_account = relationship("Account", foreign_keys=[sender_account_id])
     recipient_account = relationship("Account", foreign_keys=[recipient_account_id])
 
+    __table_args__ = (
+        Index("ix_transactions_timestamp_id", "timestamp", "id"),
+    )
+
     
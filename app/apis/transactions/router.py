@@ -3,11 +3,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Annotated
 
 from app.db.sessions import get_db
+from app.db.roundtrips import track_round_trips
 from app.core.security import get_current_user
-from app.apis.pagination import get_pagination_params, PaginationParams
+from app.core.settings import settings
+from app.apis.pagination import get_cursor_params, CursorParams, Page
 
 from app.apis.permissions import allow_admin_only
 from . import schemas, service, models
+from .coalescer import coalescer
 from app.apis.users import models as users
 
 from app.core.pdf_generator import create_receipt_pdf_with_reportlab as create_receipt_pdf
@@ -21,12 +24,29 @@ router = APIRouter(
 @router.post("/create", response_model=schemas.TransactionRead, status_code=status.HTTP_201_CREATED)
 async def create_transaction(
     transaction_in: schemas.TransactionCreate, 
+    response: Response,
     db: AsyncSession = Depends(get_db),
     current_user: users.User = Depends(get_current_user)
 ):
-    new_transaction = await service.create_transaction(db=db, transaction=transaction_in, sender_id=current_user.id)
+    with track_round_trips() as round_trips:
+        if settings.TRANSFER_COALESCE_WINDOW:
+            new_transaction = await coalescer.submit(sender=current_user, transaction=transaction_in)
+        else:
+            new_transaction = await service.create_transaction(db=db, transaction=transaction_in, sender=current_user)
+
+    response.headers["X-DB-Round-Trips"] = str(round_trips.count)
 
     return new_transaction
+
+@router.post("/batch", response_model=schemas.TransactionBatchResult)
+async def create_transactions_batch(
+    batch_in: schemas.TransactionBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: users.User = Depends(get_current_user)
+):
+    result = await service.create_transactions_batch(db=db, batch=batch_in, sender=current_user)
+
+    return result
     
 @router.get("/{id}", response_model=schemas.TransactionRead)
 async def get_transaction_by_id(
@@ -44,11 +64,11 @@ async def get_transaction_by_id(
 
     return transaction
 
-@router.get("/", response_model=List[schemas.TransactionRead])
+@router.get("/", response_model=Page[schemas.TransactionRead])
 async def get_all_transactions(
     db: AsyncSession = Depends(get_db),
     current_admin: users.User = Depends(allow_admin_only),
-    pagination: PaginationParams = Depends(get_pagination_params)
+    pagination: CursorParams = Depends(get_cursor_params)
 ):
     transactions = await service.get_all_transactions(db=db, pagination=pagination)
     return transactions
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, PositiveFloat
+from pydantic import BaseModel, PositiveFloat, Field
 from pydantic import ConfigDict
 from datetime import datetime
+from typing import List, Literal
 
 
 class TransactionBase(BaseModel):
@@ -22,3 +23,21 @@ class TransactionRead(TransactionBase):
     timestamp: datetime
     
     model_config = ConfigDict(from_attributes=True)
+
+
+class TransactionBatchCreate(BaseModel):
+    items: List[TransactionCreate] = Field(min_length=1, max_length=10000)
+    atomic: bool = False
+
+
+class TransactionBatchItemResult(BaseModel):
+    index: int
+    status: Literal["created", "failed"]
+    transaction: TransactionRead | None = None
+    detail: str | None = None
+
+
+class TransactionBatchResult(BaseModel):
+    created: int
+    failed: int
+    items: List[TransactionBatchItemResult]
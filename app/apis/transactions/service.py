@@ -1,73 +1,437 @@
-from typing import Union, List
+import random
+from typing import Union, List, Dict, Iterable, NamedTuple, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from passlib.context import CryptContext
 from sqlalchemy.future import select
+from sqlalchemy import insert, update, exists, literal, or_, func, String, Float, Integer
 from app.core import security
 from . import models, schemas
 from app.apis.users import models as users
 from ..users.models import User, UserRole 
-from app.apis.accounts.models import Account 
+from app.apis.accounts.models import Account, AccountBalanceShard
+from app.apis.accounts import service as accounts_service
+from app.apis.ledger import service as ledger_service
 from fastapi import HTTPException, status
 from sqlalchemy.orm import selectinload
-from ..pagination import PaginationParams
+from ..pagination import CursorParams, paginate
 from app.core.websocket_manager import manager as ws_manager 
+from app.core.settings import settings
+from app.db.retry import run_with_retry, is_retryable_conflict
+from sqlalchemy.orm.exc import StaleDataError
 
 
-async def create_transaction(db: AsyncSession, transaction: schemas.TransactionCreate, sender_id: int) -> models.Transaction:
-    query = select(User).where(User.email == transaction.recipient_account_email)
-    result = await db.execute(query)
-    recipient_account = result.scalar_one_or_none()
+async def create_transaction(db: AsyncSession, transaction: schemas.TransactionCreate, sender: users.User) -> models.Transaction:
+    if settings.TRANSFER_MODE == "optimistic":
+        db_transaction = await run_with_retry(
+            db,
+            lambda: _create_transaction_optimistic(db, transaction, sender_id=sender.id),
+            attempts=settings.OPTIMISTIC_RETRY_ATTEMPTS,
+            retry_if=is_retryable_conflict,
+            metric_prefix="optimistic"
+        )
+    else:
+        db_transaction = await run_with_retry(db, lambda: _apply_transfer(db, transaction, sender_id=sender.id))
 
-    if not recipient_account:
-        raise HTTPException(status_code=400, detail=f"Recipient user has no account.")
+    notification_payload = _notification_payload(db_transaction, sender_email=sender.email)
 
-    sender = await db.get(Account, sender_id)
-    recipient = await db.get(Account, recipient_account.id)
-    
-    if not sender:
-        raise HTTPException(status_code=400, detail="Sender account not found.")
+    await ws_manager.send_personal_message(notification_payload, user_id=db_transaction.recipient_account_id)
+
+    return db_transaction
+
+async def _apply_transfer(db: AsyncSession, transaction: schemas.TransactionCreate, sender_id: int) -> models.Transaction:
+    if settings.TRANSFER_MODE == "journal":
+        return await _create_transaction_journal(db, transaction, sender_id=sender_id)
+
+    db_transaction = None
+    if settings.TRANSFER_FAST_PATH and db.get_bind().dialect.name == "postgresql":
+        db_transaction = await _create_transaction_fast(db, transaction, sender_id=sender_id)
+
+    if db_transaction is None:
+        db_transaction = await _create_transaction_orm(db, transaction, sender_id=sender_id)
+
+    return db_transaction
+
+def _fast_transfer_statement(transaction: schemas.TransactionCreate, sender_id: int):
+    # Balance guard, debit, credit and ledger insert as one statement:
+    # every step only runs if the previous one returned a row.
+    recipient = (
+        select(Account.id, Account.shard_count)
+        .join(User, User.id == Account.user_id)
+        .where(User.email == transaction.recipient_account_email)
+        .cte("recipient")
+    )
+
+    # Take the row locks up front in ascending id order, like lock_accounts,
+    # so crossing A->B / B->A transfers cannot deadlock. Hot recipients are
+    # credited on a shard row and their account row is left alone.
+    locked = (
+        select(Account.id)
+        .where(or_(
+            Account.id == sender_id,
+            Account.id.in_(select(recipient.c.id).where(recipient.c.shard_count == 0))
+        ))
+        .order_by(Account.id)
+        .with_for_update()
+        .cte("locked")
+    )
+
+    debit = (
+        update(Account)
+        .where(
+            Account.id == sender_id,
+            Account.id.in_(select(locked.c.id)),
+            Account.id.not_in(select(recipient.c.id)),
+            Account.balance >= transaction.amount
+        )
+        .values(balance=Account.balance - transaction.amount, version=Account.version + 1)
+        .returning(Account.id)
+        .cte("debit")
+    )
+
+    credit = (
+        update(Account)
+        .where(
+            Account.id.in_(select(recipient.c.id).where(recipient.c.shard_count == 0)),
+            exists(select(debit.c.id))
+        )
+        .values(balance=Account.balance + transaction.amount, version=Account.version + 1)
+        .returning(Account.id)
+        .cte("credit")
+    )
+
+    shard_credit = (
+        update(AccountBalanceShard)
+        .where(
+            AccountBalanceShard.account_id.in_(select(recipient.c.id)),
+            AccountBalanceShard.slot == literal(random.randrange(1 << 30), Integer)
+                % func.nullif(select(recipient.c.shard_count).scalar_subquery(), 0),
+            exists(select(debit.c.id))
+        )
+        .values(balance=AccountBalanceShard.balance + transaction.amount)
+        .returning(AccountBalanceShard.account_id.label("id"))
+        .cte("shard_credit")
+    )
+
+    credited = select(credit.c.id).union_all(select(shard_credit.c.id)).subquery("credited")
+
+    ledger_table = models.Transaction.__table__
+    ledger = (
+        insert(ledger_table)
+        .from_select(
+            ["amount", "description", "sender_account_id", "recipient_account_id"],
+            select(
+                literal(transaction.amount, Float),
+                literal(transaction.description, String),
+                literal(sender_id, Integer),
+                credited.c.id
+            )
+        )
+        .returning(*ledger_table.c)
+        .cte("ledger")
+    )
+
+    return select(ledger)
 
-    if sender.id == recipient.id:
+async def _create_transaction_fast(db: AsyncSession, transaction: schemas.TransactionCreate, sender_id: int) -> models.Transaction | None:
+    result = await db.execute(_fast_transfer_statement(transaction, sender_id=sender_id))
+    row = result.first()
+
+    if row is None:
+        # Nothing was applied; let the locking ORM path work out which check failed.
+        await db.rollback()
+        return None
+
+    await db.commit()
+
+    return models.Transaction(**row._mapping)
+
+async def _resolve_payee(db: AsyncSession, transaction: schemas.TransactionCreate, sender_id: int) -> "Payee":
+    payees = await resolve_payees(db, [transaction.recipient_account_email])
+    payee = payees.get(transaction.recipient_account_email)
+
+    if not payee:
+        raise HTTPException(status_code=400, detail=f"Recipient user has no account.")
+
+    if sender_id == payee.account_id:
         raise HTTPException(status_code=400, detail="Cannot send money to yourself.")
 
-    await db.refresh(sender, with_for_update=True)
-    await db.refresh(recipient, with_for_update=True)
+    return payee
+
+async def _withdraw(db: AsyncSession, sender: Account, amount: float) -> float:
+    # Hot accounts keep credits on their shards; only pull them into the
+    # main balance when it cannot cover the debit on its own.
+    folded = 0.0
+    if sender.balance < amount and sender.shard_count:
+        folded = await accounts_service.fold_shards(db, sender.id)
 
-    if sender.balance < transaction.amount:
+    if sender.balance + folded < amount:
         raise HTTPException(status_code=400, detail="Insufficient funds.")
 
-    sender.balance -= transaction.amount
-    recipient.balance += transaction.amount
+    return folded
+
+async def _create_transaction_orm(db: AsyncSession, transaction: schemas.TransactionCreate, sender_id: int) -> models.Transaction:
+    payee = await _resolve_payee(db, transaction, sender_id=sender_id)
+
+    accounts = await lock_accounts(db, [sender_id] if payee.shard_count else [sender_id, payee.account_id])
+    sender = accounts.get(sender_id)
+
+    if not sender:
+        raise HTTPException(status_code=400, detail="Sender account not found.")
+
+    folded = await _withdraw(db, sender, transaction.amount)
+
+    # Relative updates stay correct even where FOR UPDATE is a no-op (SQLite)
+    sender.balance = Account.balance + (folded - transaction.amount)
+    sender.version = Account.version + 1
+
+    recipient = accounts.get(payee.account_id)
+    if recipient is not None:
+        recipient.balance = Account.balance + transaction.amount
+        recipient.version = Account.version + 1
+    else:
+        await accounts_service.credit(db, payee.account_id, transaction.amount, shard_count=payee.shard_count)
 
     db_transaction = models.Transaction(
         amount=transaction.amount,
         description=transaction.description,
         sender_account_id=sender_id,
-        recipient_account_id=recipient_account.id
+        recipient_account_id=payee.account_id
     )
 
     db.add(db_transaction)
     db.add(sender)
-    db.add(recipient)
 
     await db.commit()
     await db.refresh(db_transaction)
 
-    notification_payload = {
+    return db_transaction
+
+async def _create_transaction_optimistic(db: AsyncSession, transaction: schemas.TransactionCreate, sender_id: int) -> models.Transaction:
+    payee = await _resolve_payee(db, transaction, sender_id=sender_id)
+
+    sender = await db.get(Account, sender_id, populate_existing=True)
+
+    if not sender:
+        raise HTTPException(status_code=400, detail="Sender account not found.")
+
+    folded = await _withdraw(db, sender, transaction.amount)
+
+    # Only the debit depends on what we read, so only the sender is
+    # compare-and-swapped; credits commute and just bump the version.
+    async def _debit():
+        query = (
+            update(Account)
+            .where(Account.id == sender_id, Account.version == sender.version)
+            .values(balance=Account.balance + (folded - transaction.amount), version=Account.version + 1)
+        )
+        result = await db.execute(query)
+        if result.rowcount != 1:
+            raise StaleDataError(f"Account {sender_id} was modified concurrently.")
+
+    async def _credit():
+        await accounts_service.credit(db, payee.account_id, transaction.amount, shard_count=payee.shard_count)
+
+    # Same ascending id order as lock_accounts, so the row locks taken by
+    # the UPDATEs cannot deadlock either.
+    steps = {sender_id: _debit, payee.account_id: _credit}
+    for account_id in sorted(steps):
+        await steps[account_id]()
+
+    db_transaction = models.Transaction(
+        amount=transaction.amount,
+        description=transaction.description,
+        sender_account_id=sender_id,
+        recipient_account_id=payee.account_id
+    )
+    db.add(db_transaction)
+
+    await db.commit()
+    await db.refresh(db_transaction)
+
+    return db_transaction
+
+async def _create_transaction_journal(db: AsyncSession, transaction: schemas.TransactionCreate, sender_id: int) -> models.Transaction:
+    payee = await _resolve_payee(db, transaction, sender_id=sender_id)
+
+    # Only the sender row is locked, to serialize debits of one account;
+    # credits are appended entries and never wait on the recipient.
+    accounts = await lock_accounts(db, [sender_id])
+
+    if sender_id not in accounts:
+        raise HTTPException(status_code=400, detail="Sender account not found.")
+
+    if await accounts_service.get_balance(db, sender_id) < transaction.amount:
+        raise HTTPException(status_code=400, detail="Insufficient funds.")
+
+    db_transaction = models.Transaction(
+        amount=transaction.amount,
+        description=transaction.description,
+        sender_account_id=sender_id,
+        recipient_account_id=payee.account_id
+    )
+    db.add(db_transaction)
+    await db.flush()
+
+    await ledger_service.record_transfers(db, [db_transaction])
+
+    await db.commit()
+    await db.refresh(db_transaction)
+
+    return db_transaction
+
+def _notification_payload(db_transaction: models.Transaction, sender_email: str) -> dict:
+    return {
         "type": "NEW_TRANSACTION",
         "data": {
             "transaction_id": db_transaction.id,
             "amount": db_transaction.amount,
-            "sender_email": sender.user.email,
+            "sender_email": sender_email,
             "timestamp": db_transaction.timestamp.isoformat()
         }
     }
 
-    await ws_manager.send_personal_message(notification_payload, user_id=recipient.id)
+class Payee(NamedTuple):
+    user_id: int
+    account_id: int
+    shard_count: int
 
+async def resolve_payees(db: AsyncSession, emails: Iterable[str]) -> Dict[str, Payee]:
+    query = (
+        select(User.email, User.id, Account.id, Account.shard_count)
+        .join(Account, Account.user_id == User.id)
+        .where(User.email.in_(set(emails)))
+    )
+    result = await db.execute(query)
+    return {email: Payee(user_id, account_id, shard_count) for email, user_id, account_id, shard_count in result.all()}
 
-    return db_transaction
+async def lock_accounts(db: AsyncSession, account_ids: Iterable[int]) -> Dict[int, Account]:
+    query = (
+        select(Account)
+        .where(Account.id.in_(set(account_ids)))
+        .order_by(Account.id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    result = await db.execute(query)
+    return {account.id: account for account in result.scalars().all()}
+
+async def apply_transfers(
+    db: AsyncSession,
+    transfers: List[Tuple[users.User, schemas.TransactionCreate]],
+    atomic: bool = False
+) -> List[dict]:
+    outcomes = await run_with_retry(db, lambda: _apply_transfers(db, transfers, atomic=atomic))
+
+    for outcome in outcomes:
+        db_transaction = outcome.get("transaction")
+        if db_transaction is not None:
+            notification_payload = _notification_payload(db_transaction, sender_email=outcome.pop("sender_email"))
+            await ws_manager.send_personal_message(notification_payload, user_id=db_transaction.recipient_account_id)
+
+    return outcomes
+
+async def _apply_transfers(
+    db: AsyncSession,
+    transfers: List[Tuple[users.User, schemas.TransactionCreate]],
+    atomic: bool
+) -> List[dict]:
+    # One lookup for every payee, one locking pass over every touched account,
+    # one multi-row INSERT and one commit for the whole list of transfers.
+    # Hot payees are not locked: their credits are summed and land on a shard.
+    # In journal mode only senders are locked and credits are appended entries.
+    journal = settings.TRANSFER_MODE == "journal"
+    payees = await resolve_payees(db, (transfer.recipient_account_email for _, transfer in transfers))
+    sender_ids = {sender.id for sender, _ in transfers}
+    if journal:
+        accounts = await lock_accounts(db, sender_ids)
+        balances = await accounts_service.get_balances(db, accounts)
+    else:
+        accounts = await lock_accounts(
+            db, sender_ids | {payee.account_id for payee in payees.values() if not payee.shard_count}
+        )
+        balances = {account_id: account.balance for account_id, account in accounts.items()}
+
+    deltas = {account_id: 0.0 for account_id in accounts}
+    shard_credits = {}
+    folded = set()
+
+    outcomes = []
+    rows = []
+    for index, (sender_user, transfer) in enumerate(transfers):
+        sender = accounts.get(sender_user.id)
+        payee = payees.get(transfer.recipient_account_email)
+
+        if payee is None:
+            error = "Recipient user has no account."
+        elif sender is None:
+            error = "Sender account not found."
+        elif sender.id == payee.account_id:
+            error = "Cannot send money to yourself."
+        else:
+            if balances[sender.id] < transfer.amount and sender.shard_count and not journal and sender.id not in folded:
+                shard_total = await accounts_service.fold_shards(db, sender.id)
+                balances[sender.id] += shard_total
+                deltas[sender.id] += shard_total
+                folded.add(sender.id)
+
+            error = "Insufficient funds." if balances[sender.id] < transfer.amount else None
 
+        if error is not None:
+            if atomic:
+                raise HTTPException(status_code=400, detail=f"Item {index}: {error}")
+            outcomes.append({"index": index, "status": "failed", "detail": error})
+            continue
+
+        balances[sender.id] -= transfer.amount
+        if payee.account_id in balances:
+            balances[payee.account_id] += transfer.amount
+
+        if not journal:
+            deltas[sender.id] -= transfer.amount
+            if payee.account_id in accounts:
+                deltas[payee.account_id] += transfer.amount
+            else:
+                shard_credits[payee] = shard_credits.get(payee, 0.0) + transfer.amount
+
+        rows.append({
+            "amount": transfer.amount,
+            "description": transfer.description,
+            "sender_account_id": sender.id,
+            "recipient_account_id": payee.account_id
+        })
+        outcomes.append({"index": index, "status": "created", "sender_email": sender_user.email})
+
+    for account_id, delta in deltas.items():
+        if delta:
+            accounts[account_id].balance = Account.balance + delta
+            accounts[account_id].version = Account.version + 1
+
+    for payee, amount in shard_credits.items():
+        await accounts_service.credit(db, payee.account_id, amount, shard_count=payee.shard_count)
+
+    if rows:
+        query = insert(models.Transaction).returning(models.Transaction, sort_by_parameter_order=True)
+        result = await db.scalars(query, rows)
+        created = result.all()
+        for outcome, db_transaction in zip((o for o in outcomes if o["status"] == "created"), created):
+            outcome["transaction"] = db_transaction
+
+        if journal:
+            await ledger_service.record_transfers(db, created)
+
+    await db.commit()
+
+    return outcomes
+
+async def create_transactions_batch(db: AsyncSession, batch: schemas.TransactionBatchCreate, sender: users.User) -> dict:
+    outcomes = await apply_transfers(db, [(sender, transfer) for transfer in batch.items], atomic=batch.atomic)
+    created = sum(1 for outcome in outcomes if outcome["status"] == "created")
+
+    return {
+        "created": created,
+        "failed": len(outcomes) - created,
+        "items": outcomes
+    }
 async def get_transaction_by_id(db: AsyncSession, user: users.User, transaction_id: int) -> models.Transaction | None:
     query = (
         select(models.Transaction)
@@ -92,10 +456,15 @@ async def get_transaction_by_id(db: AsyncSession, user: users.User, transaction_
     
     return None
 
-async def get_all_transactions(db: AsyncSession, pagination: PaginationParams) -> List[models.Transaction]:
-    query = select(models.Transaction).offset(pagination["skip"]).limit(pagination["limit"])
-    result = await db.execute(query)
-    return result.scalars().all()
+async def get_all_transactions(db: AsyncSession, pagination: CursorParams) -> dict:
+    # Newest first, served by ix_transactions_timestamp_id
+    return await paginate(
+        db,
+        select(models.Transaction),
+        columns=[models.Transaction.timestamp, models.Transaction.id],
+        params=pagination,
+        descending=True
+    )
 
 async def delete_transaction(db: AsyncSession, user_id, user_role) -> models.Transaction:
     pass
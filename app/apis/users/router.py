@@ -5,6 +5,7 @@ from typing import List, Annotated
 from app.db.sessions import get_db
 from app.core.security import get_current_user
 from app.apis.permissions import allow_admin_only
+from app.apis.pagination import get_cursor_params, CursorParams, Page
 from . import schemas, service, models
 
 router = APIRouter(
@@ -34,12 +35,13 @@ async def disable_user(db: AsyncSession = Depends(get_db), current_user: models.
 
 	return current_user
 
-@router.get("/", response_model=List[schemas.UserRead])
+@router.get("/", response_model=Page[schemas.UserRead])
 async def get_all_users(
 	db: AsyncSession = Depends(get_db), 
-	current_admin: models.User = Depends(allow_admin_only)
+	current_admin: models.User = Depends(allow_admin_only),
+	pagination: CursorParams = Depends(get_cursor_params)
 ):
-    users = await service.get_all_users(db=db)
+    users = await service.get_all_users(db=db, pagination=pagination)
     return users
 
 @router.get("/{user_email}", response_model=schemas.UserRead)
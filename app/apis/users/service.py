@@ -4,6 +4,7 @@ from passlib.context import CryptContext
 from sqlalchemy.future import select
 from app.core import security
 from ..accounts.models import Account
+from ..pagination import CursorParams, paginate
 
 from . import models, schemas
 
@@ -38,10 +39,8 @@ async def create_user(db: AsyncSession, user: schemas.UserCreate) -> models.User
     
     return db_user
 
-async def get_all_users(db: AsyncSession) -> List[models.User]:
-	query = select(models.User)
-	result = await db.execute(query)
-	return result.scalars().all()
+async def get_all_users(db: AsyncSession, pagination: CursorParams) -> dict:
+	return await paginate(db, select(models.User), columns=[models.User.id], params=pagination)
 
 
 async def delete_user(db: AsyncSession, user_id: int) -> models.User:
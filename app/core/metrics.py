@@ -0,0 +1,29 @@
+from collections import Counter
+from typing import Dict
+
+
+class Metrics:
+    def __init__(self):
+        self._counters: Counter = Counter()
+        self._gauges: Dict[str, float] = {}
+
+    def incr(self, name: str, value: int = 1):
+        self._counters[name] += value
+
+    def set_gauge(self, name: str, value: float):
+        self._gauges[name] = value
+
+    def get(self, name: str) -> float:
+        if name in self._gauges:
+            return self._gauges[name]
+        return self._counters[name]
+
+    def snapshot(self) -> dict:
+        return {"counters": dict(self._counters), "gauges": dict(self._gauges)}
+
+    def reset(self):
+        self._counters.clear()
+        self._gauges.clear()
+
+
+metrics = Metrics()
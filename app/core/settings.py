@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pathlib import Path
+from typing import Literal
 
 # Get the root directory (two levels up from this file)
 ROOT_DIR = Path(__file__).resolve().parent.parent.parent
@@ -24,5 +25,24 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
 
+    # "pessimistic" locks accounts with SELECT ... FOR UPDATE,
+    # "optimistic" compare-and-swaps the sender's Account.version instead,
+    # "journal" appends immutable ledger entries and never updates balances
+    TRANSFER_MODE: Literal["pessimistic", "optimistic", "journal"] = "pessimistic"
+    # Single-statement UPDATE ... RETURNING transfers (PostgreSQL, pessimistic mode)
+    TRANSFER_FAST_PATH: bool = True
+    # Deadlock / serialization failure retries, base delay in seconds
+    TRANSFER_RETRY_ATTEMPTS: int = 5
+    TRANSFER_RETRY_BASE_DELAY: float = 0.01
+    # Version conflict retries in optimistic mode
+    OPTIMISTIC_RETRY_ATTEMPTS: int = 10
+    # Journal checkpoint compaction, in seconds; 0 disables the background job
+    LEDGER_COMPACTION_INTERVAL: float = 60.0
+    LEDGER_COMPACTION_LAG_SECONDS: float = 5.0
+    # Group commit for /transaction/create: transfers arriving within the window
+    # (seconds) or until MAX_ITEMS are queued share one DB transaction; 0 disables
+    TRANSFER_COALESCE_WINDOW: float = 0.0
+    TRANSFER_COALESCE_MAX_ITEMS: int = 100
+
 
 settings = Settings()
\ No newline at end of file
@@ -6,3 +6,4 @@ class Base(DeclarativeBase):
 from app.apis.users.models import *
 from app.apis.transactions.models import *
 from app.apis.accounts.models import *
+from app.apis.ledger.models import *
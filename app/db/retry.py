@@ -0,0 +1,63 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.metrics import metrics
+from app.core.settings import settings
+
+T = TypeVar("T")
+
+# deadlock_detected, serialization_failure
+RETRYABLE_SQLSTATES = {"40P01", "40001"}
+
+
+def is_retryable_error(exc: Exception) -> bool:
+    if not isinstance(exc, DBAPIError):
+        return False
+
+    sqlstate = getattr(exc.orig, "sqlstate", None) or getattr(exc.orig, "pgcode", None)
+    if sqlstate in RETRYABLE_SQLSTATES:
+        return True
+
+    # SQLite reports lock contention instead of deadlocks
+    return "database is locked" in str(exc.orig)
+
+
+def is_retryable_conflict(exc: Exception) -> bool:
+    return isinstance(exc, StaleDataError) or is_retryable_error(exc)
+
+
+async def run_with_retry(
+    db: AsyncSession,
+    operation: Callable[[], Awaitable[T]],
+    attempts: int | None = None,
+    retry_if: Callable[[Exception], bool] = is_retryable_error,
+    metric_prefix: str = "db",
+) -> T:
+    """Run a whole unit of work, rolling back and retrying it with jittered backoff."""
+    attempts = attempts or settings.TRANSFER_RETRY_ATTEMPTS
+
+    for attempt in range(1, attempts + 1):
+        try:
+            return await operation()
+        except Exception as exc:
+            if not retry_if(exc):
+                raise
+
+            await db.rollback()
+
+            if attempt == attempts:
+                metrics.incr(f"{metric_prefix}_retry_give_ups")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too much contention, please retry.",
+                    headers={"Retry-After": "1"},
+                ) from exc
+
+            metrics.incr(f"{metric_prefix}_retries")
+            await asyncio.sleep(random.uniform(0, settings.TRANSFER_RETRY_BASE_DELAY * 2 ** (attempt - 1)))
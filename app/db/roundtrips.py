@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.count = 0
+
+
+_current_counter: ContextVar[RoundTripCounter | None] = ContextVar("round_trip_counter", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+@event.listens_for(Engine, "commit")
+def _count_commit(conn):
+    counter = _current_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+@contextmanager
+def track_round_trips() -> Iterator[RoundTripCounter]:
+    """Count the statements and commits sent to the database inside the block."""
+    counter = RoundTripCounter()
+    token = _current_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_counter.reset(token)
@@ -1,3 +1,5 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Annotated
@@ -9,14 +11,38 @@ from app.apis.auth.router import router as auth_router
 from app.apis.transactions.router import router as transaction_router
 from app.apis.reports.router import router as report_router
 from app.apis.notifications.router import router as notifications_router
+from app.apis.metrics.router import router as metrics_router
+from app.apis.accounts.router import router as accounts_router
+from app.apis.ledger import jobs as ledger_jobs
+from app.apis.transactions.coalescer import coalescer as transfer_coalescer
+from app.core.background import run_periodically
+from app.core.settings import settings
 
 
 swagger_params = {
     "persistAuthorization": True
 }
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    background_tasks = []
+
+    if settings.TRANSFER_MODE == "journal" and settings.LEDGER_COMPACTION_INTERVAL:
+        background_tasks.append(asyncio.create_task(
+            run_periodically(settings.LEDGER_COMPACTION_INTERVAL, ledger_jobs.compact_checkpoints)
+        ))
+
+    yield
+
+    for task in background_tasks:
+        task.cancel()
+
+    await transfer_coalescer.close()
+
+
 app = FastAPI(
-    swagger_ui_parameters=swagger_params
+    swagger_ui_parameters=swagger_params,
+    lifespan=lifespan
 )
 
 origins = [
@@ -45,7 +71,9 @@ async def read_root():
 app.include_router(users_router, prefix="/users", tags=["Users"])
 app.include_router(auth_router, prefix="/auth", tags=["Auth"])
 app.include_router(transaction_router, prefix="/transaction", tags=["Transaction"])
+app.include_router(accounts_router, prefix="/accounts", tags=["Accounts"])
 app.include_router(report_router, prefix="/report", tags=["report"])
 app.include_router(notifications_router, prefix="/notifications", tags=["Notifications"])
+app.include_router(metrics_router, prefix="/metrics", tags=["Metrics"])
 
 
@@ -0,0 +1,105 @@
+"""Group commit benchmark: one commit per transfer vs the transfer coalescer.
+
+Many payers send money to one merchant at the same time; with the coalescer
+on, transfers arriving within the window share a single DB transaction.
+
+    python -m benchmarks.transfer_coalescer --payers 50 --transfers 20 --window 0.002
+
+Uses DATABASE_URL when it is set (point it at PostgreSQL for meaningful
+numbers), otherwise a throwaway SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark.sqlite")
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.apis.accounts.models import Account
+from app.apis.transactions import schemas, service
+from app.apis.transactions.coalescer import TransferCoalescer
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.db.base import Base
+from benchmarks.transfer_contention import _seed
+
+
+async def run_mode(engine, coalesce: bool, payers: int, transfers: int, concurrency: int, window: float, max_items: int) -> dict:
+    metrics.reset()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    merchant, senders = await _seed(session_factory, payers, balance=float(transfers))
+    coalescer = TransferCoalescer(session_factory, window=window, max_items=max_items)
+
+    transfer = schemas.TransactionCreate(amount=1.0, recipient_account_email=merchant.email)
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def _pay(payer):
+        nonlocal errors
+        async with gate:
+            started = time.perf_counter()
+            try:
+                if coalesce:
+                    await coalescer.submit(payer, transfer)
+                else:
+                    async with session_factory() as session:
+                        await service.create_transaction(session, transfer, sender=payer)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_pay(payer) for payer in senders for _ in range(transfers)])
+    elapsed = time.perf_counter() - started
+    await coalescer.close()
+
+    async with session_factory() as session:
+        total = (await session.execute(select(func.sum(Account.balance)))).scalar()
+
+    latencies.sort()
+    return {
+        "coalescer": "on" if coalesce else "off",
+        "transfers": len(latencies),
+        "tps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "batches": metrics.get("coalescer_batches"),
+        "errors": errors,
+        "money_conserved": total == payers * transfers,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payers", type=int, default=20)
+    parser.add_argument("--transfers", type=int, default=10, help="transfers per payer")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--window", type=float, default=0.002, help="coalescing window in seconds")
+    parser.add_argument("--max-items", type=int, default=100)
+    args = parser.parse_args()
+
+    settings.TRANSFER_MODE = "pessimistic"
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=args.concurrency, max_overflow=0)
+    try:
+        for coalesce in (False, True):
+            result = await run_mode(engine, coalesce, args.payers, args.transfers, args.concurrency, args.window, args.max_items)
+            print("  ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items()))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
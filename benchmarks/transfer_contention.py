@@ -0,0 +1,116 @@
+"""Hot-account contention benchmark: pessimistic vs optimistic transfer mode.
+
+Many payers send money to a single merchant account at the same time.
+
+    python -m benchmarks.transfer_contention --payers 50 --transfers 20
+
+Uses DATABASE_URL when it is set (point it at PostgreSQL for meaningful
+numbers), otherwise a throwaway SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./benchmark.sqlite")
+
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.apis.accounts.models import Account
+from app.apis.transactions import schemas, service
+from app.apis.users.models import User
+from app.core.metrics import metrics
+from app.core.settings import settings
+from app.db.base import Base
+
+
+async def _seed(session_factory, payers: int, balance: float):
+    async with session_factory() as session:
+        merchant = User(email="merchant@bench.local", hashed_password="-")
+        session.add(merchant)
+        await session.flush()
+        session.add(Account(id=merchant.id, user_id=merchant.id, balance=0.0))
+
+        senders = []
+        for i in range(payers):
+            payer = User(email=f"payer{i}@bench.local", hashed_password="-")
+            session.add(payer)
+            await session.flush()
+            session.add(Account(id=payer.id, user_id=payer.id, balance=balance))
+            senders.append(payer)
+
+        await session.commit()
+        return merchant, senders
+
+
+async def run_mode(engine, mode: str, payers: int, transfers: int, concurrency: int) -> dict:
+    settings.TRANSFER_MODE = mode
+    metrics.reset()
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    merchant, senders = await _seed(session_factory, payers, balance=float(transfers))
+
+    transfer = schemas.TransactionCreate(amount=1.0, recipient_account_email=merchant.email)
+    gate = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def _pay(payer):
+        nonlocal errors
+        async with gate:
+            started = time.perf_counter()
+            try:
+                async with session_factory() as session:
+                    await service.create_transaction(session, transfer, sender=payer)
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_pay(payer) for payer in senders for _ in range(transfers)])
+    elapsed = time.perf_counter() - started
+
+    async with session_factory() as session:
+        merchant_balance = (await session.get(Account, merchant.id)).balance
+
+    latencies.sort()
+    retry_metric = "optimistic" if mode == "optimistic" else "db"
+    return {
+        "mode": mode,
+        "transfers": len(latencies),
+        "tps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "retries": metrics.get(f"{retry_metric}_retries"),
+        "give_ups": metrics.get(f"{retry_metric}_retry_give_ups"),
+        "errors": errors,
+        "merchant_balance_ok": merchant_balance == len(latencies) - errors,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--payers", type=int, default=20)
+    parser.add_argument("--transfers", type=int, default=10, help="transfers per payer")
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=args.concurrency, max_overflow=0)
+    try:
+        for mode in ("pessimistic", "optimistic"):
+            result = await run_mode(engine, mode, args.payers, args.transfers, args.concurrency)
+            print("  ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items()))
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -157,7 +157,7 @@ async def test_users_list_ok_for_admin(client):
 
     resp = client.get("/users/")
     assert resp.status_code == 200
-    assert isinstance(resp.json(), list)
+    assert isinstance(resp.json()["items"], list)
 
 
 @pytest.mark.asyncio
@@ -274,7 +274,7 @@ async def test_transactions_list_admin_empty(client):
 
     resp = client.get("/transaction/")
     assert resp.status_code == 200
-    assert isinstance(resp.json(), list)
+    assert isinstance(resp.json()["items"], list)
 
 
 @pytest.mark.asyncio
@@ -292,3 +292,444 @@ async def test_delete_transaction_not_found(client):
     assert resp.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_admin_lists_walk_every_row_by_cursor(client):
+    async with AsyncSessionLocal() as session:
+        admin = await create_user(session, "cursor-admin@example.com", "adminpass", role=UserRole.ADMIN)
+        payee = await create_user(session, "cursor-payee@example.com", "pass123", balance=0.0)
+
+    async def _override_get_current_user():
+        return admin
+
+    from app.core import security as security_module
+    app.dependency_overrides[security_module.get_current_user] = _override_get_current_user
+
+    for amount in (1.0, 2.0, 3.0, 4.0, 5.0):
+        resp = client.post("/transaction/create", json={"amount": amount, "recipient_account_email": payee.email})
+        assert resp.status_code == 201
+
+    def _walk(url):
+        items, cursor = [], None
+        while True:
+            params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+            page = client.get(url, params=params).json()
+            assert len(page["items"]) <= 2
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return items
+
+    transactions = _walk("/transaction/")
+    keys = [(item["timestamp"], item["id"]) for item in transactions]
+    assert keys == sorted(keys, reverse=True)
+    assert len(set(keys)) == len(keys)
+    assert [item["amount"] for item in transactions if item["recipient_account_id"] == payee.id][:5] == [5.0, 4.0, 3.0, 2.0, 1.0]
+
+    user_ids = [item["id"] for item in _walk("/users/")]
+    assert user_ids == sorted(set(user_ids))
+    assert {admin.id, payee.id} <= set(user_ids)
+
+    assert client.get("/users/", params={"cursor": "not-a-cursor"}).status_code == 400
+
+
+
+# ------------------------------------------------------------
+# Batch transfers
+# ------------------------------------------------------------
+async def get_balance(account_id: int) -> float:
+    async with AsyncSessionLocal() as session:
+        account = await session.get(Account, account_id)
+        return account.balance
+
+
+@pytest.mark.asyncio
+async def test_batch_transfers_report_per_item_outcomes(client):
+    async with AsyncSessionLocal() as session:
+        sender = await create_user(session, "batch-sender@example.com", "pass123", balance=100.0)
+        first = await create_user(session, "batch-r1@example.com", "pass123", balance=0.0)
+        second = await create_user(session, "batch-r2@example.com", "pass123", balance=0.0)
+
+    async def _override_get_current_user():
+        return sender
+
+    from app.core import security as security_module
+    app.dependency_overrides[security_module.get_current_user] = _override_get_current_user
+
+    payload = {"items": [
+        {"amount": 30.0, "recipient_account_email": first.email},
+        {"amount": 50.0, "recipient_account_email": second.email, "description": "payout"},
+        {"amount": 40.0, "recipient_account_email": first.email},
+        {"amount": 1.0, "recipient_account_email": "nobody@example.com"},
+    ]}
+    resp = client.post("/transaction/batch", json=payload)
+    assert resp.status_code == 200, resp.text
+    data = resp.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [item["status"] for item in data["items"]] == ["created", "created", "failed", "failed"]
+    assert data["items"][1]["transaction"]["description"] == "payout"
+    assert data["items"][2]["detail"] == "Insufficient funds."
+    assert data["items"][3]["detail"] == "Recipient user has no account."
+
+    assert await get_balance(sender.id) == 20.0
+    assert await get_balance(first.id) == 30.0
+    assert await get_balance(second.id) == 50.0
+
+
+@pytest.mark.asyncio
+async def test_atomic_batch_rolls_back_on_any_failure(client):
+    async with AsyncSessionLocal() as session:
+        sender = await create_user(session, "atomic-sender@example.com", "pass123", balance=100.0)
+        recipient = await create_user(session, "atomic-r1@example.com", "pass123", balance=0.0)
+
+    async def _override_get_current_user():
+        return sender
+
+    from app.core import security as security_module
+    app.dependency_overrides[security_module.get_current_user] = _override_get_current_user
+
+    payload = {"atomic": True, "items": [
+        {"amount": 60.0, "recipient_account_email": recipient.email},
+        {"amount": 60.0, "recipient_account_email": recipient.email},
+    ]}
+    resp = client.post("/transaction/batch", json=payload)
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Item 1: Insufficient funds."
+
+    assert await get_balance(sender.id) == 100.0
+    assert await get_balance(recipient.id) == 0.0
+
+
+# ------------------------------------------------------------
+# Single transfers
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_create_transaction_moves_funds_and_reports_round_trips(client):
+    async with AsyncSessionLocal() as session:
+        sender = await create_user(session, "single-sender@example.com", "pass123", balance=100.0)
+        recipient = await create_user(session, "single-r1@example.com", "pass123", balance=0.0)
+
+    async def _override_get_current_user():
+        return sender
+
+    from app.core import security as security_module
+    app.dependency_overrides[security_module.get_current_user] = _override_get_current_user
+
+    payload = {"amount": 25.0, "recipient_account_email": recipient.email}
+    resp = client.post("/transaction/create", json=payload)
+    assert resp.status_code == 201, resp.text
+    assert resp.json()["recipient_account_id"] == recipient.id
+    assert int(resp.headers["X-DB-Round-Trips"]) > 0
+
+    assert await get_balance(sender.id) == 75.0
+    assert await get_balance(recipient.id) == 25.0
+
+
+def test_fast_transfer_is_a_single_statement():
+    from sqlalchemy.dialects import postgresql
+    from app.apis.transactions import schemas as transaction_schemas
+    from app.apis.transactions.service import _fast_transfer_statement
+
+    transfer = transaction_schemas.TransactionCreate(amount=5.0, recipient_account_email="x@example.com")
+    sql = str(_fast_transfer_statement(transfer, sender_id=1).compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("WITH recipient AS")
+    assert "ORDER BY accounts.id FOR UPDATE" in sql
+    assert "accounts.balance >= " in sql
+    assert "INSERT INTO transactions" in sql
+    assert "UPDATE account_balance_shards" in sql
+    assert sql.count("RETURNING") == 4
+
+
+# ------------------------------------------------------------
+# Concurrency: ordered locking and retries
+# ------------------------------------------------------------
+@pytest_asyncio.fixture()
+async def fresh_pool():
+    # The pool's wait queue binds to the first event loop that blocks on it;
+    # concurrent tests run on their own loop, so give them a new pool.
+    await engine.dispose()
+    yield
+    await engine.dispose()
+
+
+class _FakeDeadlock(Exception):
+    sqlstate = "40P01"
+
+
+class _FakeSession:
+    def __init__(self):
+        self.rollbacks = 0
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.mark.asyncio
+async def test_run_with_retry_retries_deadlocks_then_gives_up(monkeypatch):
+    from fastapi import HTTPException
+    from sqlalchemy.exc import DBAPIError
+    from app.core.metrics import metrics
+    from app.db.retry import run_with_retry
+
+    monkeypatch.setattr(settings, "TRANSFER_RETRY_BASE_DELAY", 0.0)
+    retries_before = metrics.get("db_retries")
+    give_ups_before = metrics.get("db_retry_give_ups")
+
+    calls = []
+
+    async def _flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise DBAPIError("UPDATE accounts", {}, _FakeDeadlock())
+        return "done"
+
+    session = _FakeSession()
+    assert await run_with_retry(session, _flaky) == "done"
+    assert session.rollbacks == 2
+    assert metrics.get("db_retries") == retries_before + 2
+
+    async def _always_deadlocks():
+        raise DBAPIError("UPDATE accounts", {}, _FakeDeadlock())
+
+    with pytest.raises(HTTPException) as exc_info:
+        await run_with_retry(_FakeSession(), _always_deadlocks, attempts=3)
+    assert exc_info.value.status_code == 503
+    assert metrics.get("db_retry_give_ups") == give_ups_before + 1
+
+
+@pytest.mark.asyncio
+async def test_crossing_transfers_do_not_fail(fresh_pool):
+    from app.apis.transactions import schemas as transaction_schemas
+    from app.apis.transactions import service as transaction_service
+    from app.core.metrics import metrics
+
+    async with AsyncSessionLocal() as session:
+        alice = await create_user(session, "cross-a@example.com", "pass123", balance=1000.0)
+        bob = await create_user(session, "cross-b@example.com", "pass123", balance=1000.0)
+
+    give_ups_before = metrics.get("db_retry_give_ups")
+
+    async def _transfer(sender, recipient):
+        transfer = transaction_schemas.TransactionCreate(amount=1.0, recipient_account_email=recipient.email)
+        async with AsyncSessionLocal() as session:
+            return await transaction_service.create_transaction(session, transfer, sender=sender)
+
+    rounds = 20
+    results = await asyncio.gather(
+        *[_transfer(alice, bob) for _ in range(rounds)],
+        *[_transfer(bob, alice) for _ in range(rounds)],
+        return_exceptions=True,
+    )
+
+    assert [r for r in results if isinstance(r, Exception)] == []
+    assert metrics.get("db_retry_give_ups") == give_ups_before
+    assert await get_balance(alice.id) == 1000.0
+    assert await get_balance(bob.id) == 1000.0
+
+
+@pytest.mark.asyncio
+async def test_optimistic_mode_keeps_hot_account_exact(monkeypatch, fresh_pool):
+    from app.apis.transactions import schemas as transaction_schemas
+    from app.apis.transactions import service as transaction_service
+
+    monkeypatch.setattr(settings, "TRANSFER_MODE", "optimistic")
+    monkeypatch.setattr(settings, "OPTIMISTIC_RETRY_ATTEMPTS", 50)
+    monkeypatch.setattr(settings, "TRANSFER_RETRY_BASE_DELAY", 0.001)
+
+    async with AsyncSessionLocal() as session:
+        merchant = await create_user(session, "occ-merchant@example.com", "pass123", balance=0.0)
+        payers = [
+            await create_user(session, f"occ-payer{i}@example.com", "pass123", balance=100.0)
+            for i in range(3)
+        ]
+
+    async def _pay(payer):
+        transfer = transaction_schemas.TransactionCreate(amount=2.0, recipient_account_email=merchant.email)
+        async with AsyncSessionLocal() as session:
+            return await transaction_service.create_transaction(session, transfer, sender=payer)
+
+    results = await asyncio.gather(*[_pay(payer) for payer in payers for _ in range(10)], return_exceptions=True)
+
+    assert [r for r in results if isinstance(r, Exception)] == []
+    assert await get_balance(merchant.id) == 60.0
+    for payer in payers:
+        assert await get_balance(payer.id) == 80.0
+
+    async with AsyncSessionLocal() as session:
+        assert (await session.get(Account, merchant.id)).version == 30
+
+
+# ------------------------------------------------------------
+# Hot accounts with sharded sub-balances
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_hot_account_balance_stays_exact(client):
+    from app.apis.accounts.models import AccountBalanceShard
+    from app.core import security as security_module
+    from sqlalchemy import select as sa_select
+
+    async with AsyncSessionLocal() as session:
+        admin = await create_user(session, "hot-admin@example.com", "pass123", role=UserRole.ADMIN)
+        merchant = await create_user(session, "hot-merchant@example.com", "pass123", balance=10.0)
+        payer = await create_user(session, "hot-payer@example.com", "pass123", balance=100.0)
+        payee = await create_user(session, "hot-payee@example.com", "pass123", balance=0.0)
+
+    current = {"user": admin}
+
+    async def _override_get_current_user():
+        return current["user"]
+
+    app.dependency_overrides[security_module.get_current_user] = _override_get_current_user
+
+    resp = client.put(f"/accounts/{merchant.id}/shards", json={"shard_count": 4})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["shard_count"] == 4
+
+    current["user"] = payer
+    for amount in (5.0, 7.0):
+        resp = client.post("/transaction/create", json={"amount": amount, "recipient_account_email": merchant.email})
+        assert resp.status_code == 201, resp.text
+    resp = client.post("/transaction/batch", json={"items": [
+        {"amount": 3.0, "recipient_account_email": merchant.email},
+        {"amount": 5.0, "recipient_account_email": merchant.email},
+    ]})
+    assert resp.json()["created"] == 2
+
+    # Credits landed on the shards; the account row itself was not touched
+    assert await get_balance(merchant.id) == 10.0
+    async with AsyncSessionLocal() as session:
+        shards = (await session.execute(
+            sa_select(AccountBalanceShard.balance).where(AccountBalanceShard.account_id == merchant.id)
+        )).scalars().all()
+    assert len(shards) == 4
+    assert sum(shards) == 20.0
+
+    current["user"] = merchant
+    resp = client.get("/accounts/me")
+    assert resp.json()["balance"] == 30.0
+
+    # A debit larger than the main balance folds the shards in first
+    resp = client.post("/transaction/create", json={"amount": 25.0, "recipient_account_email": payee.email})
+    assert resp.status_code == 201, resp.text
+    assert client.get("/accounts/me").json()["balance"] == 5.0
+
+    resp = client.post("/transaction/create", json={"amount": 6.0, "recipient_account_email": payee.email})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Insufficient funds."
+
+    from datetime import date
+    tomorrow = date.today() + timedelta(days=1)
+    resp = client.get("/report/summary", params={"end_date": tomorrow.isoformat()})
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["ending_balance"] == 5.0
+
+
+# ------------------------------------------------------------
+# Journal mode: append-only ledger with checkpoints
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_journal_mode_derives_balances_from_entries(client, monkeypatch):
+    from app.apis.ledger import service as ledger_service
+    from app.apis.ledger.models import LedgerEntry, BalanceCheckpoint
+    from app.core import security as security_module
+    from sqlalchemy import select as sa_select, func as sa_func
+
+    monkeypatch.setattr(settings, "TRANSFER_MODE", "journal")
+    monkeypatch.setattr(settings, "LEDGER_COMPACTION_LAG_SECONDS", 0)
+
+    async with AsyncSessionLocal() as session:
+        payer = await create_user(session, "journal-payer@example.com", "pass123", balance=100.0)
+        payee = await create_user(session, "journal-payee@example.com", "pass123", balance=0.0)
+
+    current = {"user": payer}
+
+    async def _override_get_current_user():
+        return current["user"]
+
+    app.dependency_overrides[security_module.get_current_user] = _override_get_current_user
+
+    resp = client.post("/transaction/create", json={"amount": 30.0, "recipient_account_email": payee.email})
+    assert resp.status_code == 201, resp.text
+    resp = client.post("/transaction/batch", json={"items": [
+        {"amount": 10.0, "recipient_account_email": payee.email},
+        {"amount": 5.0, "recipient_account_email": payee.email},
+    ]})
+    assert resp.json()["created"] == 2
+
+    # Balances were never updated in place
+    assert await get_balance(payer.id) == 100.0
+    assert await get_balance(payee.id) == 0.0
+    assert client.get("/accounts/me/balance").json()["balance"] == 55.0
+
+    async with AsyncSessionLocal() as session:
+        entries = (await session.execute(
+            sa_select(sa_func.count()).select_from(LedgerEntry).where(LedgerEntry.account_id.in_([payer.id, payee.id]))
+        )).scalar()
+        assert entries == 6
+        assert await ledger_service.compact_checkpoints(session) >= 2
+
+    resp = client.post("/transaction/create", json={"amount": 5.0, "recipient_account_email": payee.email})
+    assert resp.status_code == 201
+    resp = client.post("/transaction/create", json={"amount": 60.0, "recipient_account_email": payee.email})
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Insufficient funds."
+
+    async with AsyncSessionLocal() as session:
+        await ledger_service.compact_checkpoints(session)
+        checkpoints = (await session.execute(
+            sa_select(BalanceCheckpoint.balance)
+            .where(BalanceCheckpoint.account_id == payer.id)
+            .order_by(BalanceCheckpoint.entry_id)
+        )).scalars().all()
+    assert checkpoints == [-45.0, -50.0]
+
+    assert client.get("/accounts/me/balance").json()["balance"] == 50.0
+    resp = client.get("/accounts/me/balance", params={"as_of": "2000-01-01T00:00:00"})
+    assert resp.json()["balance"] == 100.0
+
+    current["user"] = payee
+    assert client.get("/accounts/me/balance").json()["balance"] == 50.0
+
+
+# ------------------------------------------------------------
+# Group commit: coalesced single transfers
+# ------------------------------------------------------------
+@pytest.mark.asyncio
+async def test_coalescer_commits_concurrent_transfers_together(fresh_pool):
+    from fastapi import HTTPException
+    from app.apis.transactions import schemas as transaction_schemas
+    from app.apis.transactions.coalescer import TransferCoalescer
+    from app.core.metrics import metrics
+
+    async with AsyncSessionLocal() as session:
+        payer = await create_user(session, "coalesce-payer@example.com", "pass123", balance=50.0)
+        payee = await create_user(session, "coalesce-payee@example.com", "pass123", balance=0.0)
+
+    metrics.reset()
+    coalescer = TransferCoalescer(AsyncSessionLocal, window=0.05, max_items=100)
+    transfer = transaction_schemas.TransactionCreate(amount=10.0, recipient_account_email=payee.email)
+
+    results = await asyncio.gather(
+        *[coalescer.submit(payer, transfer) for _ in range(6)],
+        return_exceptions=True
+    )
+
+    created = [result for result in results if not isinstance(result, Exception)]
+    failed = [result for result in results if isinstance(result, Exception)]
+    assert len(created) == 5
+    assert len({db_transaction.id for db_transaction in created}) == 5
+    assert len(failed) == 1
+    assert isinstance(failed[0], HTTPException) and failed[0].detail == "Insufficient funds."
+    assert metrics.get("coalescer_batches") == 1
+    assert metrics.get("coalescer_items") == 6
+
+    assert await get_balance(payer.id) == 0.0
+    assert await get_balance(payee.id) == 50.0
+
+    # A full batch flushes immediately instead of waiting for the window
+    slow = TransferCoalescer(AsyncSessionLocal, window=60, max_items=1)
+    refund = transaction_schemas.TransactionCreate(amount=5.0, recipient_account_email=payer.email)
+    db_transaction = await asyncio.wait_for(slow.submit(payee, refund), timeout=5)
+    assert db_transaction.sender_account_id == payee.id
+    await slow.close()